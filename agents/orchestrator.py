@@ -5,22 +5,29 @@ The Orchestrator encapsulates the logic for a single exploration session.
 It runs the bounded exploration to generate a sequence of novel questions and
 then performs a dissonance scan on the resulting questions to surface
 potential contradictions.  The combined result is returned to the API
-layer for presentation to the user.
+layer for presentation to the user, either at once (`run_cycle`) or as a
+stream of events (`stream_cycle`).
 """
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List
 
 from engine.curiosity_engine import CuriosityEngine
 
 
+# Number of questions requested from the LLM in each exploration round
+QUESTIONS_PER_ROUND = 6
+
+
 class Orchestrator:
     """Coordinate exploration and contradiction detection."""
 
     def __init__(self, engine: CuriosityEngine) -> None:
         self.engine = engine
 
-    async def run_cycle(self, topic: str) -> Dict[str, Any]:
+    async def run_cycle(self, topic: str, refresh: bool = False) -> Dict[str, Any]:
         """
         Execute a full curiosity cycle for the given topic.
 
@@ -35,6 +42,9 @@ class Orchestrator:
         ----------
         topic : str
             Seed topic from which to start the exploration.
+        refresh : bool, optional
+            Bypass the LLM completion cache so that a topic that was asked
+            about before gets new questions.  Defaults to False.
 
         Returns
         -------
@@ -42,13 +52,53 @@ class Orchestrator:
             A dictionary containing the original topic, session details and
             a list of detected contradictions.
         """
-        session = await self.engine.bounded_explore(seed=topic, per_round=6)
+        session = await self.engine.bounded_explore(
+            seed=topic, per_round=QUESTIONS_PER_ROUND, refresh=refresh
+        )
         # Extract the question texts for dissonance scanning.  Limit to 8
         # questions to keep the number of pairwise comparisons manageable.
         questions = [item["q"] for item in session["trail"]][:8]
-        dissonance = self.engine.dissonance_scan(questions)
+        # The NLI scan is CPU bound; keep it off the event loop so that other
+        # requests (including open streams) are served meanwhile
+        dissonance = await asyncio.to_thread(self.engine.dissonance_scan, questions)
         return {
             "topic": topic,
             "session": session,
             "dissonance": dissonance,
-        }
\ No newline at end of file
+        }
+
+    async def stream_cycle(self, topic: str, refresh: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute a curiosity cycle, yielding events as results become available.
+
+        This runs the same steps as `run_cycle` but does not wait for the
+        whole session to finish.  The events are:
+
+        * ``{"type": "start", "expected": ...}`` first, where ``expected`` is
+          the most questions the session can produce, so clients can show
+          progress.
+        * ``{"type": "question", "q": ..., "novelty": ...}`` for every
+          accepted question, as soon as its round completes.
+        * ``{"type": "done", "elapsed_s": ..., "dissonance": [...]}`` once,
+          after the dissonance scan.
+
+        Parameters
+        ----------
+        topic : str
+            Seed topic from which to start the exploration.
+        refresh : bool, optional
+            As for `run_cycle`.
+        """
+        start = time.time()
+        yield {"type": "start", "expected": self.engine.max_r * QUESTIONS_PER_ROUND}
+        questions: List[str] = []
+        async for fresh, novelty in self.engine.explore(
+            seed=topic, per_round=QUESTIONS_PER_ROUND, refresh=refresh
+        ):
+            for q, n in zip(fresh, self.engine.novelty_list(novelty)):
+                questions.append(q)
+                yield {"type": "question", "q": q, "novelty": n}
+        elapsed = round(time.time() - start, 2)
+        # The NLI scan is CPU bound; keep it off the event loop
+        dissonance = await asyncio.to_thread(self.engine.dissonance_scan, questions[:8])
+        yield {"type": "done", "elapsed_s": elapsed, "dissonance": dissonance}
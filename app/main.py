@@ -4,7 +4,11 @@ FastAPI application entry point for the Curiosity AI service.
 This module initialises the retrieval, curiosity engine and orchestrator
 using the configuration defined in `config/config.yaml`.  It exposes a single
 endpoint `/ask` which accepts a seed topic and returns a curiosity trail of
-questions along with any detected contradictions.
+questions along with any detected contradictions.  `/ask/stream` returns the
+same information as a stream of newline-delimited JSON (NDJSON) events, so
+clients can show each question as soon as it is generated.  Clients that send
+`Accept: application/msgpack` get both responses encoded as MessagePack,
+which is smaller than JSON and keeps novelty scores as binary floats.
 
 To run the server locally:
 
@@ -18,8 +22,16 @@ corresponding API keys are set in your environment variables.
 from __future__ import annotations
 
 import asyncio
+import gzip
+import json
+from typing import AsyncIterator
+
+import msgpack
 import yaml
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 
 from engine.retrieval import Retriever
@@ -27,13 +39,8 @@ from engine.curiosity_engine import CuriosityEngine
 from agents.orchestrator import Orchestrator
 
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware  # Add this import
-
-
 app = FastAPI(title="Curiosity AI API", version="0.1")
 
-# ADD THIS SECTION
 # Configure Cross-Origin Resource Sharing (CORS) so browsers can call the API
 origins = ["*"]  # For development allow all origins; restrict in production
 app.add_middleware(
@@ -61,7 +68,8 @@ cfg = _load_config("config/config.yaml")
 retriever = Retriever(
     embedder_name=cfg["retrieval"]["embedder"],
     index_path=cfg["retrieval"]["index_path"],
-    graph_path=cfg["retrieval"].get("graph_path", "")
+    graph_path=cfg["retrieval"].get("graph_path", ""),
+    backend=cfg["retrieval"].get("embedder_backend", "torch"),
 )
 
 # Instantiate the curiosity engine with model settings, retrieval and NLI.
@@ -69,19 +77,83 @@ engine = CuriosityEngine(
     model_spec=cfg["models"]["primary"],
     retriever=retriever,
     nli_name=cfg["models"]["nli"],
+    nli_quantize=cfg["models"].get("nli_quantize", True),
+    nli_backend=cfg["models"].get("nli_backend", "torch"),
+    nli_threads=cfg["models"].get("nli_threads"),
     novelty_threshold=cfg["engine"]["novelty_threshold"],
     max_round_seconds=cfg["engine"]["max_round_seconds"],
-    max_rounds=cfg["engine"]["max_rounds"]
+    max_rounds=cfg["engine"]["max_rounds"],
+    pair_similarity_threshold=cfg["engine"].get("pair_similarity_threshold", 0.4),
+    plateau_epsilon=cfg["engine"].get("plateau_epsilon", 0.02),
 )
 
 # High level orchestrator wraps the engine and adds dissonance detection.
 orchestrator = Orchestrator(engine)
 
 
+# Media type of MessagePack-encoded responses
+MSGPACK = "application/msgpack"
+# `/ask` responses of at least this many bytes are gzip-compressed for
+# clients that accept it; smaller responses are not worth the CPU.
+GZIP_MIN_SIZE = 500
+
+
+def _accept_weights(header: str) -> dict:
+    """Parse an Accept-style header into a mapping of lower-cased values to q-values."""
+    weights: dict = {}
+    for item in header.split(","):
+        media_type, *params = (part.strip() for part in item.split(";"))
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        media_type = media_type.lower()
+        if media_type:
+            weights[media_type] = max(q, weights.get(media_type, 0.0))
+    return weights
+
+
+def _wants_msgpack(request: Request) -> bool:
+    """
+    Return True if the client prefers MessagePack to the default JSON.
+
+    The media types in the Accept header are weighed by their q-values.
+    MessagePack is chosen only if it is acceptable (q > 0) and ranked
+    strictly above every other concrete media type listed; wildcards such
+    as `*/*` do not compete, and JSON wins ties.
+    """
+    weights = _accept_weights(request.headers.get("accept", ""))
+    wanted = weights.pop(MSGPACK, 0.0)
+    others = [q for media_type, q in weights.items() if "*" not in media_type]
+    return wanted > 0 and wanted > max(others, default=0.0)
+
+
+def _body_response(request: Request, body: bytes, media_type: str) -> Response:
+    """
+    Wrap a complete response body, gzip-compressing it for clients that accept it.
+
+    Compression is applied here rather than by a middleware so that the
+    streaming endpoint is never compressed: a gzip stream holds small events
+    in its buffer instead of sending them as soon as they are produced.
+    """
+    headers = {"Vary": "Accept-Encoding"}
+    accept_encoding = _accept_weights(request.headers.get("accept-encoding", ""))
+    if len(body) >= GZIP_MIN_SIZE and accept_encoding.get("gzip", 0.0) > 0:
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, media_type=media_type, headers=headers)
+
+
 class AskRequest(BaseModel):
     """Schema for incoming requests to the `/ask` endpoint."""
 
     topic: str
+    # Generate new questions instead of reusing cached LLM completions
+    refresh: bool = False
 
 
 class AskResponse(BaseModel):
@@ -92,7 +164,11 @@ class AskResponse(BaseModel):
     dissonance: list
 
 
-app = FastAPI(title="Curiosity AI API", version="0.1")
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    """Release the pooled HTTP connections held by the model router."""
+
+    await engine.router.aclose()
 
 
 @app.get("/health")
@@ -102,29 +178,67 @@ def health() -> dict:
     return {"status": "ok"}
 
 @app.get("/")
-def health() -> dict:
+def home() -> dict:
     """Home Page."""
 
     return {"status": "Welcome"}
 
 @app.post("/ask", response_model=AskResponse)
-async def ask(req: AskRequest) -> AskResponse:
+async def ask(req: AskRequest, request: Request) -> Response:
     """
     Generate a curiosity trail of questions for a given topic.
 
     The request body must contain a `topic` field with a string describing
-    what the user is interested in.  The engine will perform a bounded
+    what the user is interested in.  Set the optional `refresh` field to get
+    new questions for a topic rather than cached LLM completions.  The engine will perform a bounded
     exploration starting from this seed topic and return a list of questions
     ranked by novelty, along with any contradictory pairs of statements.
 
     If the engine fails to produce any questions an HTTP error is raised.
+    The response is MessagePack rather than JSON if the client accepts it,
+    and is gzip-compressed when large enough and the client accepts gzip.
     """
     if not req.topic or not req.topic.strip():
         raise HTTPException(status_code=400, detail="Topic must be a non-empty string.")
     try:
         # The orchestrator returns a dictionary with the original topic,
         # session information (including the question trail) and dissonance entries.
-        result = await orchestrator.run_cycle(req.topic)
+        result = await orchestrator.run_cycle(req.topic, refresh=req.refresh)
     except Exception as e:  # pragma: no cover - catch unforeseen errors
         raise HTTPException(status_code=500, detail=f"Failed to generate questions: {e}")
-    return AskResponse(**result)
\ No newline at end of file
+    if _wants_msgpack(request):
+        return _body_response(request, msgpack.packb(result), MSGPACK)
+    body = json.dumps(jsonable_encoder(AskResponse(**result))).encode("utf-8")
+    return _body_response(request, body, "application/json")
+
+
+@app.post("/ask/stream")
+async def ask_stream(req: AskRequest, request: Request) -> StreamingResponse:
+    """
+    Stream a curiosity trail for a given topic as newline-delimited JSON.
+
+    Each event is a line holding one JSON object with a `type` field: a
+    `start` event with the `expected` maximum number of questions, a
+    `question` event per accepted question as soon as its round completes,
+    then a final `done` event with the elapsed time and the dissonance log.
+    If the engine fails mid-stream an `error` event with a `detail` message
+    is sent instead of `done`.
+
+    If the client accepts MessagePack the events are instead sent as a
+    sequence of MessagePack maps with no further framing.
+    """
+    if not req.topic or not req.topic.strip():
+        raise HTTPException(status_code=400, detail="Topic must be a non-empty string.")
+    if _wants_msgpack(request):
+        encode, media_type = msgpack.packb, MSGPACK
+    else:
+        encode, media_type = (lambda event: json.dumps(event) + "\n"), "application/x-ndjson"
+
+    async def events() -> AsyncIterator[str | bytes]:
+        try:
+            async for event in orchestrator.stream_cycle(req.topic, refresh=req.refresh):
+                yield encode(event)
+        except Exception as e:  # pragma: no cover - catch unforeseen errors
+            yield encode({"type": "error", "detail": f"Failed to generate questions: {e}"})
+
+    return StreamingResponse(events(), media_type=media_type)
@@ -9,14 +9,19 @@ terminate exploration when new questions stop contributing meaningful novelty.
 from __future__ import annotations
 
 import asyncio
-import math
+import re
 import time
-from typing import Any, Dict, List, Tuple
+from itertools import combinations
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import numpy as np
 
 from .models import ModelRouter
 from .retrieval import Retriever
 from .nli_contradiction import NLIDetector
 
+# Matches a numbered list item such as "1. text" or "2) text" and captures the text
+_Q_RE = re.compile(r"^\s*\d+[.)]\s*(?P<q>.+?)\s*$")
 
 class CuriosityEngine:
     """Engine for generating and evaluating questions using LLMs and retrieval."""
@@ -29,13 +34,22 @@ class CuriosityEngine:
         novelty_threshold: float = 0.35,
         max_round_seconds: float = 25.0,
         max_rounds: int = 3,
+        nli_quantize: bool = True,
+        pair_similarity_threshold: float | None = 0.4,
+        nli_backend: str = "torch",
+        plateau_epsilon: float | None = 0.02,
+        nli_threads: int | None = None,
     ) -> None:
         self.router = ModelRouter(model_spec)
         self.retriever = retriever
-        self.nli = NLIDetector(nli_name)
+        self.nli = NLIDetector(
+            nli_name, quantize=nli_quantize, backend=nli_backend, num_threads=nli_threads
+        )
         self.nov_thr = novelty_threshold
         self.max_s = max_round_seconds
         self.max_r = max_rounds
+        self.pair_thr = pair_similarity_threshold
+        self.plateau_eps = plateau_epsilon
 
         # Prompt templates used when querying the LLM
         self.rubric = (
@@ -47,26 +61,48 @@ class CuriosityEngine:
             "Produce up to {n} distinct questions (<=25 words). Number them."
         )
 
-    def _novelty(self, question: str) -> float:
+    def _novelty_batch(self, questions: List[str]) -> np.ndarray:
+        """
+        Compute novelty scores for questions based on their distance to
+        existing knowledge snippets.  A higher value indicates a more novel
+        question.
+
+        Each score is 1 minus the mean similarity over the top k retrieval
+        results.  For cosine indexes the similarity is the cosine score
+        itself; for L2 indexes exp(-d) converts squared Euclidean distances
+        to a similarity-like measure bounded between 0 and 1.  All questions
+        are embedded and searched in a single batch and the scores are
+        computed with NumPy over the resulting score matrix.  Returns a
+        float32 array aligned with `questions`.
         """
-        Compute a novelty score for a question based on its distance to existing
-        knowledge snippets.  A higher value indicates a more novel question.
+        if not questions:
+            return np.empty(0, dtype=np.float32)
+        dists, indices = self.retriever.search_batch(questions, k=5)
+        valid = indices >= 0
+        sims = np.where(valid, self.retriever.to_similarity(dists), 0.0)
+        counts = valid.sum(axis=1)
+        # Lower similarity => more novel; default to 0.5 without any hits
+        novelty = np.where(counts > 0, 1.0 - sims.sum(axis=1) / np.maximum(counts, 1), 0.5)
+        return np.clip(novelty, 0.0, 1.0).astype(np.float32)
 
-        The score is calculated as 1 minus the mean of exp(-distance) over the
-        top k retrieval results.  Distances are squared Euclidean distances from
-        the FAISS index; exp(-d) converts distances to a similarity-like measure
-        bounded between 0 and 1.
+    @staticmethod
+    def novelty_list(novelty: np.ndarray) -> List[float]:
         """
-        hits = self.retriever.search(question, k=5)
-        if not hits:
-            return 0.5  # Default novelty if no knowledge to compare against
-        sims = [math.exp(-max(d, 0.0)) for _, d in hits]
-        # Lower similarity => more novel
-        novelty = 1.0 - (sum(sims) / len(sims))
-        # Clamp to [0, 1]
-        return max(0.0, min(1.0, novelty))
-
-    async def generate_questions(self, topic: str, n: int = 6) -> List[Dict[str, Any]]:
+        Convert float32 novelty scores to Python floats for API responses.
+
+        Widening float32 directly gives values such as 0.8999999761581421;
+        rounding in float64 to four decimals yields clean numbers instead.
+        """
+        return novelty.astype(np.float64).round(4).tolist()
+
+    @classmethod
+    def _as_records(cls, questions: List[str], novelty: np.ndarray) -> List[Dict[str, Any]]:
+        """Materialise parallel question/novelty arrays as a list of dictionaries."""
+        return [{"q": q, "novelty": n} for q, n in zip(questions, cls.novelty_list(novelty))]
+
+    async def generate_questions(
+        self, topic: str, n: int = 6, refresh: bool = False
+    ) -> List[Dict[str, Any]]:
         """
         Generate a list of candidate questions for a given topic.
 
@@ -82,6 +118,9 @@ class CuriosityEngine:
             question if called from the exploration loop.
         n : int, optional
             Number of questions to request from the LLM.  Defaults to 6.
+        refresh : bool, optional
+            Ask the LLM again instead of reusing a cached completion for the
+            same prompt.  Defaults to False.
 
         Returns
         -------
@@ -89,44 +128,66 @@ class CuriosityEngine:
             A list of dictionaries containing the question text and its
             novelty score, sorted descending by novelty.
         """
+        questions, novelty = await self._generate(topic, n, refresh)
+        return self._as_records(questions, novelty)
+
+    async def _generate(
+        self, topic: str, n: int, refresh: bool = False
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Implementation of `generate_questions` returning parallel arrays.
+
+        Returns the question texts and a float32 array of their novelty
+        scores, both sorted descending by novelty.  Keeping the scores in one
+        array lets callers filter and compare them without per-question
+        dictionaries.
+        """
         # Retrieve context sentences to seed the LLM.  These provide
-        # background information and anchor the model's generation.
-        context_hits = self.retriever.search(topic, k=6)
-        context_lines = [text for text, _ in context_hits]
+        # background information and anchor the model's generation.  The
+        # encoder and FAISS calls block, so run them off the event loop to let
+        # concurrent generations overlap their LLM requests.  Repeated topics
+        # are served from the retriever's search cache, and a topic that was
+        # scored in the previous round has its embedding cached already.
+        _, context_idx = await asyncio.to_thread(self.retriever.search_batch, [topic], 6)
+        context_lines = [self.retriever.texts[i] for i in context_idx[0] if i >= 0]
         context_block = "\n- ".join(context_lines)
         # Build the full prompt
         prompt = self.prompt_template.format(rubric=self.rubric, ctx=context_block, n=n)
         # Query the model.  We request asynchronous completions from the router.
-        raw_output = await self.router.completions(prompt)
+        raw_output = await self.router.completions(prompt, use_cache=not refresh)
         # Parse the numbered list of questions.  Accept lines that begin with
         # a numeral followed by a dot or parenthesis, or lines of reasonable length.
-        questions: List[Dict[str, Any]] = []
+        lines: List[str] = []
         for line in raw_output.splitlines():
-            line = line.strip()
-            if not line:
-                continue
             # Remove leading numbering if present
-            prefix_removed = False
-            if (line[0].isdigit() and "." in line[:3]) or (line[0].isdigit() and line[1] in {')', '.'}):
-                parts = line.split(".", 1) if "." in line[:3] else line.split(")", 1)
-                if len(parts) == 2:
-                    line = parts[1].strip()
-                    prefix_removed = True
+            m = _Q_RE.match(line)
+            line = m.group("q") if m else line.strip()
             if len(line) < 6:
                 continue
-            novelty = self._novelty(line)
-            questions.append({"q": line, "novelty": novelty})
+            lines.append(line)
+        # Score all parsed questions in one batched retrieval call
+        novelty = await asyncio.to_thread(self._novelty_batch, lines)
         # Sort by novelty descending
-        questions.sort(key=lambda x: x["novelty"], reverse=True)
-        return questions
+        order = np.argsort(-novelty, kind="stable")
+        return [lines[i] for i in order], novelty[order]
 
-    async def bounded_explore(self, seed: str, per_round: int = 6) -> Dict[str, Any]:
+    async def bounded_explore(
+        self, seed: str, per_round: int = 6, branches: int = 2, refresh: bool = False
+    ) -> Dict[str, Any]:
         """
         Perform a bounded exploration starting from a seed question or topic.
 
         The engine will generate batches of questions, evaluate their novelty
         and continue exploring the most novel question until either the
         specified number of rounds is reached or the allotted time expires.
+        Exploration also stops early once novelty plateaus, i.e. when a
+        round's best novelty does not improve on the previous round's by at
+        least the engine's `plateau_epsilon` (None disables this check).
+
+        After the first round the top `branches` questions are explored
+        speculatively in parallel.  The branch whose best question is the most
+        novel is kept and the others are discarded, so a round costs roughly
+        one LLM round trip however many branches are tried.
 
         Parameters
         ----------
@@ -134,6 +195,13 @@ class CuriosityEngine:
             Initial topic or question to explore.
         per_round : int, optional
             Number of questions to request from the LLM in each round.  Defaults to 6.
+        branches : int, optional
+            Number of candidate questions to explore concurrently in each
+            round after the first.  Defaults to 2.
+        refresh : bool, optional
+            Ask the LLM again for every prompt instead of reusing cached
+            completions, so that a topic can be explored afresh.  Defaults
+            to False.
 
         Returns
         -------
@@ -142,31 +210,66 @@ class CuriosityEngine:
             and the elapsed time of the session.
         """
         start = time.time()
-        trail: List[Dict[str, Any]] = []
-        current_seed = seed
+        trail: List[str] = []
+        trail_novelty: List[np.ndarray] = []
+        async for fresh, fresh_novelty in self.explore(seed, per_round, branches, refresh):
+            trail.extend(fresh)
+            trail_novelty.append(fresh_novelty)
+        novelty = np.concatenate(trail_novelty) if trail_novelty else np.empty(0, dtype=np.float32)
+        return {
+            "trail": self._as_records(trail, novelty),
+            "elapsed_s": round(time.time() - start, 2),
+        }
+
+    async def explore(
+        self, seed: str, per_round: int = 6, branches: int = 2, refresh: bool = False
+    ) -> AsyncIterator[Tuple[List[str], np.ndarray]]:
+        """
+        Run the bounded exploration, yielding each round's results as they arrive.
+
+        This is the incremental form of `bounded_explore`, with the same
+        parameters and stopping rules.  Each item is a pair of the questions
+        accepted in one round and their float32 novelty scores, sorted
+        descending by novelty.
+        """
+        start = time.time()
+        seeds = [seed]
+        prev_top: float | None = None
         for _ in range(self.max_r):
             if time.time() - start > self.max_s:
                 break
-            batch = await self.generate_questions(current_seed, n=per_round)
-            # Filter questions that exceed the novelty threshold
-            fresh = [q for q in batch if q["novelty"] >= self.nov_thr]
+            batches = await asyncio.gather(*(self._generate(s, per_round, refresh) for s in seeds))
+            # Filter questions that exceed the novelty threshold.  Batches are
+            # sorted, so these form a prefix of each batch.
+            candidates = []
+            for questions, novelty in batches:
+                keep = int(np.count_nonzero(novelty >= self.nov_thr))
+                candidates.append((questions[:keep], novelty[:keep]))
+            # Keep the branch with the most novel question
+            fresh, fresh_novelty = max(candidates, key=lambda c: c[1][0] if c[0] else -1.0)
             if not fresh:
                 break
-            # Append to trail and set the most novel question as the next seed
-            trail.extend(fresh)
-            current_seed = fresh[0]["q"]
-        return {
-            "trail": trail,
-            "elapsed_s": round(time.time() - start, 2),
-        }
+            # Hand the round to the caller and explore the most novel questions next
+            yield fresh, fresh_novelty
+            seeds = fresh[:branches]
+            # Further rounds are unlikely to pay for their LLM calls once
+            # novelty stops improving
+            top = float(fresh_novelty[0])
+            if self.plateau_eps is not None and prev_top is not None and top - prev_top < self.plateau_eps:
+                break
+            prev_top = top
 
     def dissonance_scan(self, texts: List[str], threshold: float = 0.65) -> List[Dict[str, Any]]:
         """
         Detect strongly contradictory pairs of sentences within a list.
 
-        Each pair of sentences is evaluated by the NLI model.  If the
-        contradiction probability is above `threshold` the pair is recorded
-        along with the probability.
+        Pairs are first pre-filtered by the cosine similarity of their
+        embeddings: topically unrelated sentences essentially never contradict,
+        so only pairs above the engine's `pair_similarity_threshold` are sent
+        to the NLI model (all pairs if the threshold is None).  The remaining
+        pairs are evaluated in a single batch.  If the contradiction
+        probability is above `threshold` the pair is recorded along with the
+        probability.
 
         Parameters
         ----------
@@ -180,12 +283,22 @@ class CuriosityEngine:
         List[Dict[str, Any]]
             A list of dictionaries with keys 'a', 'b' and 'contradiction'.
         """
-        contradictions: List[Dict[str, Any]] = []
         n = len(texts)
-        for i in range(n):
-            for j in range(i + 1, n):
-                a, b = texts[i], texts[j]
-                score = self.nli.contradiction(a, b)
-                if score >= threshold:
-                    contradictions.append({"a": a, "b": b, "contradiction": round(score, 3)})
-        return contradictions
\ No newline at end of file
+        if self.pair_thr is None or n < 2:
+            pairs = list(combinations(range(n), 2))
+        else:
+            # The questions were embedded for novelty scoring, so this is
+            # normally served from the retriever's cache.
+            emb = self.retriever.encode(texts)
+            emb = emb / np.maximum(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12)
+            sim = emb @ emb.T
+            idx_i, idx_j = np.triu_indices(n, k=1)
+            keep = sim[idx_i, idx_j] > self.pair_thr
+            pairs = list(zip(idx_i[keep].tolist(), idx_j[keep].tolist()))
+        # Score every pair in one batched forward pass rather than one per pair
+        scores = self.nli.contradiction_batch([(texts[i], texts[j]) for i, j in pairs])
+        return [
+            {"a": texts[i], "b": texts[j], "contradiction": round(score, 3)}
+            for (i, j), score in zip(pairs, scores)
+            if score >= threshold
+        ]
\ No newline at end of file
@@ -11,13 +11,19 @@ example `ollama:llama3`, `openai:gpt-3.5-turbo`, or `anthropic:claude-3-haiku`.
 """
 from __future__ import annotations
 
+import hashlib
 import os
+from collections import OrderedDict
 from typing import Tuple
 from .prompt import SYSTEM_PROMPT
 
 import httpx
 
 
+# Maximum number of completions kept in the router's LRU cache
+COMPLETION_CACHE_SIZE = 1024
+
+
 class ModelRouter:
     """Route completion requests to the appropriate model provider.
 
@@ -25,6 +31,13 @@ class ModelRouter:
     asynchronous method ``completions`` that takes a prompt and returns the
     generated response.  If no provider is recognised, the router will return
     the prompt itself as a fallback.
+
+    A single HTTP client is shared by all requests so that connections (and
+    their TLS sessions) are kept alive and reused between calls.  Call
+    ``aclose`` on shutdown to release them.
+
+    Completions are cached in memory by model and prompt, so repeated topics
+    are answered without another round trip to the provider.
     """
 
     def __init__(self, model_spec: str) -> None:
@@ -37,8 +50,20 @@ class ModelRouter:
             provider, model = "echo", model_spec
         self.provider: str = provider.lower()
         self.model: str = model
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, read=60.0),
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+            http2=True,
+        )
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
 
-    async def completions(self, prompt: str, max_tokens: int | None = None) -> str:
+    async def aclose(self) -> None:
+        """Close the shared HTTP client and its pooled connections."""
+        await self._client.aclose()
+
+    async def completions(
+        self, prompt: str, max_tokens: int | None = None, use_cache: bool = True
+    ) -> str:
         """
         Generate a completion for a given prompt using the configured provider.
 
@@ -49,6 +74,10 @@ class ModelRouter:
         max_tokens : int, optional
             Maximum number of tokens to return.  Only used for API providers
             that support this parameter.  Defaults to provider defaults.
+        use_cache : bool, optional
+            When False the provider is always called, even if the prompt is
+            cached; a successful result still replaces the cached one.
+            Defaults to True.
 
         Returns
         -------
@@ -56,20 +85,39 @@ class ModelRouter:
             The generated text from the model.  If the provider is not known
             the prompt is returned unchanged.
         """
+        if self.provider not in {"openai", "anthropic", "ollama"}:
+            # Echo provider: simply return the prompt
+            return prompt
+        key = hashlib.blake2b(
+            f"{self.provider}:{self.model}||{max_tokens}||{prompt}".encode("utf-8"),
+            digest_size=16,
+        ).hexdigest()
+        cached = self._cache.get(key) if use_cache else None
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
         # Dispatch based on provider
         if self.provider == "openai":
-            return await self._call_openai(prompt, max_tokens)
-        if self.provider == "anthropic":
-            return await self._call_anthropic(prompt, max_tokens)
-        if self.provider == "ollama":
-            return await self._call_ollama(prompt)
-        # Echo provider: simply return the prompt
-        return prompt
-
-    async def _call_openai(self, prompt: str, max_tokens: int | None) -> str:
+            text, ok = await self._call_openai(prompt, max_tokens)
+        elif self.provider == "anthropic":
+            text, ok = await self._call_anthropic(prompt, max_tokens)
+        else:
+            text, ok = await self._call_ollama(prompt)
+        # Provider failures come back as diagnostics with ok=False; never
+        # cache those (or empty completions) so the next call retries.
+        if ok and text.strip():
+            self._cache[key] = text
+            if len(self._cache) > COMPLETION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return text
+
+    # Each provider call returns `(text, ok)`.  When `ok` is False the text is
+    # a bracketed diagnostic rather than a completion.
+
+    async def _call_openai(self, prompt: str, max_tokens: int | None) -> Tuple[str, bool]:
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
-            return "[OPENAI] missing OPENAI_API_KEY"
+            return "[OPENAI] missing OPENAI_API_KEY", False
         url = "https://api.openai.com/v1/completions"
         headers = {
             "Authorization": f"Bearer {api_key}",
@@ -85,22 +133,20 @@ class ModelRouter:
             "temperature": 0.7,
             "max_tokens": max_tokens or 300,
         }
-        timeout = httpx.Timeout(30.0, read=60.0)
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            r = await client.post(
-                    url,
-                    headers=headers,
-                    json=payload,)
-            if r.status_code != 200:
-                return f"[OPENAI ERROR] {r.status_code}: {r.text}"
-            data = r.json()
-            return data["choices"][0]["message"]["content"]
-
-    async def _call_anthropic(self, prompt: str, max_tokens: int | None) -> str:
+        r = await self._client.post(
+                url,
+                headers=headers,
+                json=payload,)
+        if r.status_code != 200:
+            return f"[OPENAI ERROR] {r.status_code}: {r.text}", False
+        data = r.json()
+        return data["choices"][0]["message"]["content"], True
+
+    async def _call_anthropic(self, prompt: str, max_tokens: int | None) -> Tuple[str, bool]:
         """Call the Anthropic messages endpoint."""
         api_key = os.getenv("ANTHROPIC_API_KEY")
         if not api_key:
-            return "[ANTHROPIC_API_KEY environment variable not set]"
+            return "[ANTHROPIC_API_KEY environment variable not set]", False
         # Anthropic uses a different payload structure; messages is a list of
         # dictionaries with ``role`` and ``content`` keys.  The model
         # specification includes the version after the colon.
@@ -111,22 +157,22 @@ class ModelRouter:
             ],
             "max_tokens": max_tokens or 800,
         }
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": api_key,
-                    "anthropic-version": "2023-06-01",
-                },
-                json=payload,
-            )
-            response.raise_for_status()
-            data = response.json()
-            # The response content is an array of messages; the first element
-            # contains the assistant's text in the "text" field.
-            return data["content"][0]["text"]
+        response = await self._client.post(
+            "https://api.anthropic.com/v1/messages",
+            headers={
+                "x-api-key": api_key,
+                "anthropic-version": "2023-06-01",
+            },
+            json=payload,
+            timeout=60,
+        )
+        response.raise_for_status()
+        data = response.json()
+        # The response content is an array of messages; the first element
+        # contains the assistant's text in the "text" field.
+        return data["content"][0]["text"], True
 
-    async def _call_ollama(self, prompt: str) -> str:
+    async def _call_ollama(self, prompt: str) -> Tuple[str, bool]:
         """Call a locally running Ollama model."""
         # Ollama must be installed and running on the local machine (default
         # port 11434).  The /api/generate endpoint supports basic prompt and
@@ -136,13 +182,19 @@ class ModelRouter:
             "prompt": prompt,
             "stream": False,
         }
-        async with httpx.AsyncClient(timeout=120) as client:
-            try:
-                response = await client.post(
-                    "http://localhost:11434/api/generate",
-                    json=payload,
-                )
-                data = response.json()
-                return data.get("response", "")
-            except Exception:
-                return "[Failed to call Ollama; is the service running?]"
\ No newline at end of file
+        try:
+            response = await self._client.post(
+                "http://localhost:11434/api/generate",
+                json=payload,
+                timeout=120,
+            )
+        except Exception:
+            return "[Failed to call Ollama; is the service running?]", False
+        if response.status_code != 200:
+            # e.g. 404 {"error": "model not found"} when the model is not pulled
+            return f"[OLLAMA ERROR] {response.status_code}: {response.text}", False
+        try:
+            data = response.json()
+        except ValueError:
+            return "[Failed to parse the Ollama response]", False
+        return data.get("response", ""), True
\ No newline at end of file
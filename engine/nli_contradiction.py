@@ -4,33 +4,109 @@ Natural Language Inference (NLI) based contradiction detection.
 This module wraps a Hugging Face transformers model that has been fine
 tuned for natural language inference.  It computes the probability that
 two sentences contradict each other by evaluating them with the model.
+
+The model runs with PyTorch by default.  It can instead be run with ONNX
+Runtime (``backend="onnx"``), which fuses operators and is typically faster
+on CPU; this requires the optional ``optimum[onnxruntime]`` package.  Use
+``scripts/export_onnx.py`` to export (and optionally quantise) a model ahead
+of time.
 """
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import Tuple
+from typing import List, Tuple
 
 import os
 import torch
 os.environ.setdefault("TRANSFORMERS_NO_TF_IMPORTS", "1")
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 
+from .threads import threads_per_worker
+
 
 class NLIDetector:
     """Detect contradictions between pairs of sentences using an NLI model."""
 
-    def __init__(self, model_name: str = "roberta-large-mnli") -> None:
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/nli-deberta-v3-xsmall",
+        quantize: bool = True,
+        backend: str = "torch",
+        num_threads: int | None = None,
+    ) -> None:
         """
         Load the specified NLI model and tokenizer.  The default model is
-        ``roberta-large-mnli`` which performs well on general language.  If
-        working in specialised domains (e.g. biomedical) you may wish to
-        substitute a domain-specific model.
+        ``cross-encoder/nli-deberta-v3-xsmall``, a small distilled model that
+        is an order of magnitude cheaper than ``roberta-large-mnli`` while
+        detecting contradictions nearly as well.  If working in specialised
+        domains (e.g. biomedical) you may wish to substitute a
+        domain-specific model.
+
+        When `quantize` is true the model is run at reduced precision: fp16
+        on a CUDA GPU, or with int8 dynamically quantised linear layers on
+        CPU.  Either roughly halves inference time at a negligible cost in
+        accuracy.
+
+        When `backend` is ``"onnx"`` the model is run with ONNX Runtime
+        instead.  `model_name` may then be a directory written by
+        ``scripts/export_onnx.py``; a Hub model name is exported on the fly.
+        `quantize` does not apply, since quantisation happens at export time.
+        `num_threads` sets the number of ONNX Runtime intra-op threads.  By
+        default the CPU cores are split evenly between the worker processes
+        given by the ``WEB_CONCURRENCY`` environment variable, so that
+        several workers do not each claim every core.
         """
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        if backend == "onnx":
+            self.model = self._load_onnx(model_name, num_threads)
+        elif backend != "torch":
+            raise ValueError(f"Unknown NLI backend: {backend}")
+        else:
+            self._load_torch(model_name, quantize)
+        # NLI models disagree on label order, so look up the contradiction
+        # class by name.  Fall back to the MNLI convention of index 0.
+        self.contradiction_idx = 0
+        for idx, label in self.model.config.id2label.items():
+            if label.lower().startswith("contradict"):
+                self.contradiction_idx = int(idx)
+                break
+
+    def _load_torch(self, model_name: str, quantize: bool) -> None:
         self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
         self.model.eval()
+        if torch.cuda.is_available():
+            self.model.to("cuda")
+            if quantize:
+                self.model.half()
+        elif quantize:
+            self.model = torch.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+
+    @staticmethod
+    def _load_onnx(model_name: str, num_threads: int | None):
+        # Imported lazily so that optimum is only required for this backend
+        import onnxruntime as ort
+        from optimum.onnxruntime import ORTModelForSequenceClassification
 
-    @torch.no_grad()
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = num_threads or threads_per_worker()
+        kwargs = {}
+        if os.path.isdir(model_name):
+            # Prefer the int8 model written by export_onnx.py --quantize
+            if os.path.exists(os.path.join(model_name, "model_quantized.onnx")):
+                kwargs["file_name"] = "model_quantized.onnx"
+        else:
+            kwargs["export"] = True
+        return ORTModelForSequenceClassification.from_pretrained(
+            model_name,
+            session_options=options,
+            provider="CPUExecutionProvider",
+            **kwargs,
+        )
+
+    @torch.inference_mode()
     def contradiction(self, sentence_a: str, sentence_b: str) -> float:
         """
         Compute the probability that `sentence_a` contradicts `sentence_b`.
@@ -39,8 +115,33 @@ class NLIDetector:
         'contradiction' class of the NLI model's output distribution.
         """
         inputs = self.tokenizer(sentence_a, sentence_b, return_tensors="pt", truncation=True)
+        inputs = {k: v.to(self.model.device) for k, v in inputs.items()}
         outputs = self.model(**inputs)
-        logits = outputs.logits.squeeze(0)
+        logits = outputs.logits.squeeze(0).float()
+        probs = torch.softmax(logits, dim=-1)
+        return float(probs[self.contradiction_idx].item())
+
+    @torch.inference_mode()
+    def contradiction_batch(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """
+        Compute contradiction probabilities for many sentence pairs at once.
+
+        All pairs are tokenised together (padded to the longest pair) and
+        scored with a single forward pass, which is far cheaper than calling
+        :meth:`contradiction` once per pair.  The returned list is aligned
+        with `pairs`.
+        """
+        if not pairs:
+            return []
+        sentences_a, sentences_b = zip(*pairs)
+        inputs = self.tokenizer(
+            list(sentences_a),
+            list(sentences_b),
+            padding=True,
+            truncation=True,
+            return_tensors="pt",
+        )
+        inputs = {k: v.to(self.model.device) for k, v in inputs.items()}
+        logits = self.model(**inputs).logits.float()
         probs = torch.softmax(logits, dim=-1)
-        # The classes are ordered as [contradiction, neutral, entailment]
-        return float(probs[0].item())
\ No newline at end of file
+        return probs[:, self.contradiction_idx].tolist()
\ No newline at end of file
@@ -2,43 +2,130 @@
 Retrieval utilities for Curiosity AI.
 
 This module provides a simple wrapper around a FAISS index built from a
-collection of text snippets.  It also loads a corresponding metadata file
+collection of text snippets.  It also opens a corresponding metadata store
 containing the raw texts and, optionally, a knowledge graph for more
 sophisticated reasoning.  The primary method `search` returns the most
-similar snippets to a given query.
+similar snippets to a given query; `search_batch` does the same for many
+queries at once.
 """
 from __future__ import annotations
 
 import json
 import os
-from typing import List, Tuple
+import threading
+from collections import OrderedDict
+from typing import List, Sequence, Tuple
 
 import faiss
+import lmdb
 import numpy as np
+import torch
 
 os.environ.setdefault("TRANSFORMERS_NO_TF_IMPORTS", "1")
 from sentence_transformers import SentenceTransformer
 import networkx as nx
 
 
+# Maximum number of query embeddings kept in the per-retriever LRU cache
+EMBED_CACHE_SIZE = 4096
+# Maximum number of per-query search results kept in the LRU cache
+SEARCH_CACHE_SIZE = 4096
+
+
+class LMDBTexts:
+    """
+    Read-only, list-like view of index texts stored in an LMDB environment.
+
+    Texts are fetched from the memory-mapped database on demand, so only the
+    sentences actually returned by searches are materialised as Python
+    strings.  Entries are keyed by their index id as written by
+    `scripts/build_vectorstore.py`.
+
+    LMDB environments must not be used across a fork, so the environment is
+    reopened in any process other than the one that opened it.  This keeps
+    the store usable when the app is preloaded by a pre-forking server.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._pid = -1
+        self._env = None
+        with self.env.begin() as txn:
+            self._len = int(txn.get(b"__len__", b"0"))
+
+    @property
+    def env(self) -> lmdb.Environment:
+        if self._pid != os.getpid():
+            self._env = lmdb.open(self.path, readonly=True, lock=False, readahead=False)
+            self._pid = os.getpid()
+        return self._env
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, idx: int) -> str:
+        with self.env.begin() as txn:
+            value = txn.get(str(int(idx)).encode())
+        if value is None:
+            raise IndexError(idx)
+        return value.decode("utf-8")
+
+
 class Retriever:
     """Vector retrieval using FAISS and sentence transformers."""
 
-    def __init__(self, embedder_name: str, index_path: str, graph_path: str | None = None) -> None:
+    def __init__(
+        self,
+        embedder_name: str,
+        index_path: str,
+        graph_path: str | None = None,
+        backend: str = "torch",
+    ) -> None:
         # Load the embedding model once.  SentenceTransformer caches models
         # locally and downloads them if necessary.  The model must match
-        # the one used to build the FAISS index.
-        self.model = SentenceTransformer(embedder_name)
+        # the one used to build the FAISS index.  On a CUDA GPU the encoder
+        # runs in fp16, which is many times faster than fp32 on CPU.  With
+        # backend="onnx" the encoder runs with ONNX Runtime instead, which
+        # requires sentence-transformers>=3.2 and optimum[onnxruntime].
+        if backend not in ("torch", "onnx"):
+            raise ValueError(f"Unknown embedder backend: {backend}")
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        if backend == "torch":
+            self.model = SentenceTransformer(embedder_name, device=device)
+            if device == "cuda":
+                self.model.half()
+        else:
+            self.model = SentenceTransformer(embedder_name, device=device, backend=backend)
+        # Query embeddings are cached by their exact text.  The same strings
+        # are embedded repeatedly (a question is scored for novelty and may
+        # then become the next round's topic), so this avoids re-encoding.
+        self._emb_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        # The engine searches from worker threads, so guard the cache
+        self._emb_lock = threading.Lock()
+        # The index never changes after loading, so search results can be
+        # cached per (query, k) too; the same topics and questions are
+        # searched again across rounds and requests.
+        self._search_cache: "OrderedDict[Tuple[str, int], Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._search_lock = threading.Lock()
         self.index = None
-        self.texts: List[str] = []
-        # Load the FAISS index.  A corresponding .meta.json file should exist
-        # containing a dictionary with a "texts" field storing the original
-        # sentences used to build the index.
+        # True when the index scores by inner product over normalised vectors
+        # (cosine similarity) rather than by squared L2 distance.
+        self.cosine = False
+        self.texts: Sequence[str] = []
+        # Load the FAISS index.  The original sentences used to build it are
+        # read from a corresponding .lmdb store; indexes built by older
+        # versions of the build script have a .meta.json file instead, with a
+        # "texts" field holding every sentence.
         if os.path.exists(index_path):
             try:
-                self.index = faiss.read_index(index_path)
+                self.index = self._read_index(index_path)
+                self._configure_search(self.index)
+                self.cosine = self.index.metric_type == faiss.METRIC_INNER_PRODUCT
+                lmdb_path = index_path + ".lmdb"
                 meta_path = index_path + ".meta.json"
-                if os.path.exists(meta_path):
+                if os.path.exists(lmdb_path):
+                    self.texts = LMDBTexts(lmdb_path)
+                elif os.path.exists(meta_path):
                     with open(meta_path, "r", encoding="utf-8") as f:
                         meta = json.load(f)
                     self.texts = meta.get("texts", [])
@@ -58,6 +145,31 @@ class Retriever:
         else:
             self.graph = nx.Graph()
 
+    @staticmethod
+    def _read_index(index_path: str) -> faiss.Index:
+        """
+        Read a FAISS index, memory-mapping it where the index type allows.
+
+        A memory-mapped index is paged in by the OS on demand instead of being
+        copied into RAM up front, which lowers the resident set of large
+        indexes and lets several worker processes share the same pages.
+        """
+        try:
+            return faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            # Not every index type supports memory-mapping
+            return faiss.read_index(index_path)
+
+    @staticmethod
+    def _configure_search(index: faiss.Index) -> None:
+        """Set query-time parameters for approximate index types."""
+        # Approximate indexes trade recall for speed; these values favour
+        # recall while remaining far cheaper than exhaustive search.
+        if isinstance(index, faiss.IndexHNSW):
+            index.hnsw.efSearch = 64
+        elif isinstance(index, faiss.IndexIVF):
+            index.nprobe = 16
+
     def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
         """
         Search the FAISS index for the `k` nearest neighbours of `query`.
@@ -72,21 +184,126 @@ class Retriever:
         Returns
         -------
         List[Tuple[str, float]]
-            A list of tuples `(text, distance)` where `text` is a sentence
-            from the corpus and `distance` is the squared Euclidean distance
-            between the query embedding and the sentence embedding.  If the
-            index is not available an empty list is returned.
+            A list of tuples `(text, score)` where `text` is a sentence from
+            the corpus.  For cosine indexes `score` is the cosine similarity
+            between the query and the sentence; otherwise it is the squared
+            Euclidean distance between their embeddings.  If the index is not
+            available an empty list is returned.
         """
-        if self.index is None or not self.texts:
-            return []
-        # Compute the embedding for the query.  FAISS expects float32 arrays.
-        emb = self.model.encode([query])
-        emb = np.array(emb, dtype="float32")
-        # Perform the search.  The FAISS index stores squared L2 distances by default.
-        distances, indices = self.index.search(emb, k)
+        distances, indices = self.search_batch([query], k)
         results = []
         for dist, idx in zip(distances[0], indices[0]):
-            if idx < 0 or idx >= len(self.texts):
+            if idx < 0:
                 continue
             results.append((self.texts[idx], float(dist)))
-        return results
\ No newline at end of file
+        return results
+
+    def search_batch(self, queries: List[str], k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search the FAISS index for the `k` nearest neighbours of every query.
+
+        All queries are embedded in a single encoder call and looked up with a
+        single FAISS search, which is much cheaper than calling `search` once
+        per query.  Results are cached per `(query, k)`, so only queries that
+        have not been searched recently reach the encoder and the index.
+
+        Parameters
+        ----------
+        queries : List[str]
+            Query strings to embed and search for.
+        k : int, optional
+            Number of neighbours per query.  Defaults to 5.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            `(distances, indices)` arrays of shape `(len(queries), k)` as
+            returned by FAISS.  Slots without a valid neighbour have index -1.
+            If the index is not available both arrays have zero columns.
+        """
+        if self.index is None or not self.texts or not queries:
+            empty = np.empty((len(queries), 0))
+            return empty.astype("float32"), empty.astype("int64")
+        rows = {}
+        with self._search_lock:
+            for q in queries:
+                hit = self._search_cache.get((q, k))
+                if hit is not None:
+                    self._search_cache.move_to_end((q, k))
+                    rows[q] = hit
+        missing = [q for q in dict.fromkeys(queries) if q not in rows]
+        if missing:
+            distances, indices = self.search_embeddings(self.encode(missing), k)
+            with self._search_lock:
+                for q, dist, idx in zip(missing, distances, indices):
+                    rows[q] = self._search_cache[(q, k)] = (dist, idx)
+                while len(self._search_cache) > SEARCH_CACHE_SIZE:
+                    self._search_cache.popitem(last=False)
+        # Stacking copies the rows, so callers never modify cached arrays
+        return (
+            np.stack([rows[q][0] for q in queries]),
+            np.stack([rows[q][1] for q in queries]),
+        )
+
+    def search_embeddings(self, emb: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search the FAISS index with precomputed query embeddings.
+
+        `emb` is a matrix with one row per query, as returned by `encode`.
+        The return value has the same form as `search_batch`.
+        """
+        if self.index is None or not self.texts or len(emb) == 0:
+            empty = np.empty((len(emb), 0))
+            return empty.astype("float32"), empty.astype("int64")
+        # Copy so that normalising never touches the caller's (or cached) vectors
+        emb = np.array(emb, dtype="float32")
+        if self.cosine:
+            # Inner product equals cosine similarity only for unit vectors
+            faiss.normalize_L2(emb)
+        distances, indices = self.index.search(emb, k)
+        indices[indices >= len(self.texts)] = -1
+        return distances, indices
+
+    def to_similarity(self, scores: np.ndarray) -> np.ndarray:
+        """
+        Convert raw FAISS scores into similarities in [0, 1].
+
+        Cosine scores are already similarities and are only clipped.  Squared
+        L2 distances are mapped through exp(-d).
+        """
+        if self.cosine:
+            return np.clip(scores, 0.0, 1.0)
+        return np.exp(-np.clip(scores, 0.0, None))
+
+    def encode(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed `queries`, reusing cached vectors where possible.
+
+        Queries missing from the cache are encoded together in one batch.
+        Returns a float32 matrix with one row per query, as FAISS expects.
+        Callers that need an embedding more than once (e.g. for retrieval and
+        for scoring) should compute it here once and pass it around.
+        """
+        if not queries:
+            return np.empty((0, self.model.get_sentence_embedding_dimension()), dtype="float32")
+        vectors = {}
+        with self._emb_lock:
+            for q in queries:
+                if q in self._emb_cache:
+                    self._emb_cache.move_to_end(q)
+                    vectors[q] = self._emb_cache[q]
+        missing = [q for q in dict.fromkeys(queries) if q not in vectors]
+        if missing:
+            embs = self.model.encode(
+                missing,
+                batch_size=64,
+                normalize_embeddings=False,
+                convert_to_numpy=True,
+            )
+            with self._emb_lock:
+                for q, emb in zip(missing, np.asarray(embs, dtype="float32")):
+                    vectors[q] = emb
+                    self._emb_cache[q] = emb
+                while len(self._emb_cache) > EMBED_CACHE_SIZE:
+                    self._emb_cache.popitem(last=False)
+        return np.stack([vectors[q] for q in queries])
@@ -0,0 +1,31 @@
+"""
+CPU thread sizing for models run by several worker processes.
+
+Torch and ONNX Runtime each default to one thread per CPU core.  When the
+API is served by several worker processes (see `gunicorn.conf.py`) every
+worker would claim every core, oversubscribing the CPU.  `threads_per_worker`
+splits the cores evenly instead.
+"""
+from __future__ import annotations
+
+import os
+
+
+def threads_per_worker(workers: int | None = None) -> int:
+    """
+    Return the number of CPU threads each worker process should use.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Number of worker processes sharing the machine.  Defaults to the
+        ``WEB_CONCURRENCY`` environment variable, or 1 if it is not set.
+
+    Returns
+    -------
+    int
+        The CPU core count divided evenly between the workers, at least 1.
+    """
+    if workers is None:
+        workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    return max((os.cpu_count() or 1) // max(workers, 1), 1)
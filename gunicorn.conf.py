@@ -0,0 +1,41 @@
+"""
+Gunicorn configuration for serving the Curiosity AI API with several workers.
+
+Usage:
+
+```
+gunicorn -c gunicorn.conf.py app.main:app
+```
+
+The app is preloaded in the master process before the workers are forked.
+The FAISS index, the LMDB text store and the model weights are therefore
+loaded once and shared copy-on-write by every worker, instead of being read
+from disk again by each worker.  This cuts startup time and memory use.
+"""
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# Number of worker processes.  WEB_CONCURRENCY is the conventional variable
+# read by uvicorn and most hosting platforms.
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# CUDA cannot be used in a process forked after it was initialised.  When the
+# models run on a GPU set GUNICORN_PRELOAD=0 (and usually WEB_CONCURRENCY=1).
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+# An exploration session makes several LLM calls; allow for slow providers.
+timeout = 120
+
+
+def post_fork(server, worker):
+    """Give each worker an even share of the CPU cores for torch inference."""
+    # Torch defaults to one intra-op thread per core in every process, so
+    # the NLI model and the embedder of N workers would oversubscribe the
+    # CPU N times over.  The ONNX backend is sized the same way.
+    import torch
+
+    from engine.threads import threads_per_worker
+
+    torch.set_num_threads(threads_per_worker(server.cfg.workers))
@@ -3,8 +3,10 @@ Script to build a FAISS vector store from a directory of text files.
 
 This script reads all `.txt` files in the specified data directory, splits
 them into sentences, embeds them using a sentence transformer model and
-writes a FAISS index to disk.  A corresponding `.meta.json` file is also
-written containing the raw sentences used to build the index.
+writes a FAISS index to disk.  The raw sentences used to build the index are
+written to an accompanying LMDB key-value store (`<index-path>.lmdb`), keyed
+by their position in the index, so that the API can look up individual
+sentences without loading the whole corpus into memory.
 
 Usage:
 
@@ -15,16 +17,30 @@ python scripts/build_vectorstore.py --data-dir data --index-path config/index.fa
 The default model is `sentence-transformers/all-MiniLM-L6-v2` which offers
 a good balance between speed and quality.  To build an index for a larger
 corpus or a specialised domain you may choose a different model.
+
+The index type is selected with `--index-type`:
+
+* `hnsw` (default) – an HNSW graph index.  Search is roughly logarithmic in
+  the corpus size and no training step is required.
+* `ivfpq` – an inverted file index with product quantisation.  Vectors are
+  compressed, which greatly reduces memory, but the index must be trained
+  and needs at least a few hundred sentences.
+* `flat` – exact brute-force search.  Only sensible for small corpora.
+
+Embeddings are L2-normalised and every index type scores by inner product,
+so search results are cosine similarities.
 """
 from __future__ import annotations
 
 import argparse
 import glob
-import json
+import math
 import os
 from typing import List
 
 import faiss
+import lmdb
+import torch
 os.environ.setdefault("TRANSFORMERS_NO_TF_IMPORTS", "1")
 from sentence_transformers import SentenceTransformer
 
@@ -42,17 +58,64 @@ def collect_texts(data_dir: str) -> List[str]:
     return texts
 
 
-def build_index(texts: List[str], model_name: str) -> faiss.Index:
-    """Embed a list of texts and construct a FAISS index."""
+# Sentences per encoder batch.  Large batches keep the GPU (or all CPU cores) busy.
+EMBED_BATCH_SIZE = 256
+# Sentences embedded and added to the index at a time, bounding peak memory
+CHUNK_SIZE = 100_000
+# Number of neighbours per node in the HNSW graph
+HNSW_M = 32
+# Number of sub-quantizers and bits per code for IVFPQ.  The embedding
+# dimension must be divisible by PQ_M.
+PQ_M = 16
+PQ_NBITS = 8
+
+
+def make_index(index_type: str, dim: int, n: int) -> faiss.Index:
+    """Create an empty FAISS index of the given type for `n` vectors of size `dim`."""
+    if index_type == "flat":
+        return faiss.IndexFlatIP(dim)
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = 200
+        return index
+    if index_type == "ivfpq":
+        # Product quantisation trains 2**PQ_NBITS centroids per sub-quantizer
+        if n < 2 ** PQ_NBITS:
+            raise ValueError(f"IVFPQ needs at least {2 ** PQ_NBITS} sentences to train; got {n}.")
+        nlist = min(4096, 4 * int(math.sqrt(n)))
+        quantizer = faiss.IndexFlatIP(dim)
+        return faiss.IndexIVFPQ(quantizer, dim, nlist, PQ_M, PQ_NBITS, faiss.METRIC_INNER_PRODUCT)
+    raise ValueError(f"Unknown index type: {index_type}")
+
+
+def build_index(texts: List[str], model_name: str, index_type: str = "hnsw") -> faiss.Index:
+    """Embed a list of texts and construct a FAISS index of the given type."""
     if not texts:
         raise ValueError("No texts provided for indexing.")
-    model = SentenceTransformer(model_name)
-    embeddings = model.encode(texts, batch_size=32, show_progress_bar=True)
-    # Convert embeddings to float32 as required by FAISS
-    emb = embeddings.astype("float32")
-    dim = emb.shape[1]
-    index = faiss.IndexFlatL2(dim)
-    index.add(emb)
+    # Let FAISS train and add with every core
+    faiss.omp_set_num_threads(os.cpu_count() or 1)
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = SentenceTransformer(model_name, device=device)
+    if device == "cuda":
+        model.half()
+    index = None
+    # Embed in chunks so that large corpora never hold every embedding at once
+    for start in range(0, len(texts), CHUNK_SIZE):
+        embeddings = model.encode(
+            texts[start:start + CHUNK_SIZE],
+            batch_size=EMBED_BATCH_SIZE,
+            show_progress_bar=True,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        # Convert embeddings to float32 as required by FAISS
+        emb = embeddings.astype("float32")
+        if index is None:
+            index = make_index(index_type, emb.shape[1], len(texts))
+            if not index.is_trained:
+                # Train on the first chunk, which is a large enough sample
+                index.train(emb)
+        index.add(emb)
     return index
 
 
@@ -60,9 +123,18 @@ def save_index(index: faiss.Index, index_path: str, texts: List[str]) -> None:
     """Save the FAISS index and associated metadata to disk."""
     os.makedirs(os.path.dirname(index_path), exist_ok=True)
     faiss.write_index(index, index_path)
-    meta = {"texts": texts}
-    with open(index_path + ".meta.json", "w", encoding="utf-8") as f:
-        json.dump(meta, f, ensure_ascii=False, indent=2)
+    # Store each sentence under its index id.  The map size is an upper bound
+    # on the database size; allow generous headroom for LMDB page overhead.
+    encoded = [t.encode("utf-8") for t in texts]
+    map_size = 2 * sum(len(t) + 64 for t in encoded) + (10 << 20)
+    env = lmdb.open(index_path + ".lmdb", map_size=map_size)
+    with env.begin(write=True) as txn:
+        # Remove entries left over from a previous, larger build
+        txn.drop(env.open_db(txn=txn), delete=False)
+        for i, text in enumerate(encoded):
+            txn.put(str(i).encode(), text)
+        txn.put(b"__len__", str(len(encoded)).encode())
+    env.close()
 
 
 def main() -> None:
@@ -71,6 +143,8 @@ def main() -> None:
     parser.add_argument("--index-path", type=str, required=True, help="Path to output FAISS index file.")
     parser.add_argument("--model", type=str, default="sentence-transformers/all-MiniLM-L6-v2",
                         help="Sentence transformer model to use for embeddings.")
+    parser.add_argument("--index-type", type=str, default="hnsw", choices=["hnsw", "ivfpq", "flat"],
+                        help="Type of FAISS index to build.")
     args = parser.parse_args()
 
     texts = collect_texts(args.data_dir)
@@ -78,7 +152,7 @@ def main() -> None:
         print(f"No suitable lines found in {args.data_dir}.")
         return
     print(f"Collected {len(texts)} sentences. Embedding...")
-    index = build_index(texts, args.model)
+    index = build_index(texts, args.model, args.index_type)
     save_index(index, args.index_path, texts)
     print(f"Index written to {args.index_path}")
 
@@ -0,0 +1,60 @@
+"""
+Script to export the NLI model to ONNX for use with ONNX Runtime.
+
+The exported model is graph-optimised by ONNX Runtime at load time and can
+optionally be quantised to int8, which together are typically 1.5-3x faster
+than eager PyTorch on CPU.  Point `models.nli` in `config/config.yaml` at the
+output directory and set `models.nli_backend` to `onnx` to use it.
+
+Usage:
+
+```
+python scripts/export_onnx.py --model cross-encoder/nli-deberta-v3-xsmall --output-dir models/nli-onnx --quantize
+```
+
+The sentence embedder does not need a separate export step: with
+`retrieval.embedder_backend: onnx` sentence-transformers exports it on first
+load.
+
+Requires the optional `optimum[onnxruntime]` package.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+
+os.environ.setdefault("TRANSFORMERS_NO_TF_IMPORTS", "1")
+from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoTokenizer
+
+
+def export_model(model_name: str, output_dir: str, quantize: bool) -> None:
+    """Export `model_name` to ONNX in `output_dir`, optionally with an int8 copy."""
+    model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    if quantize:
+        # Dynamic quantisation needs no calibration data.  The resulting
+        # model_quantized.onnx is picked up automatically by NLIDetector.
+        quantizer = ORTQuantizer.from_pretrained(model)
+        qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=output_dir, quantization_config=qconfig)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export an NLI model to ONNX.")
+    parser.add_argument("--model", type=str, default="cross-encoder/nli-deberta-v3-xsmall",
+                        help="Hugging Face NLI model to export.")
+    parser.add_argument("--output-dir", type=str, required=True, help="Directory to write the ONNX model to.")
+    parser.add_argument("--quantize", action="store_true", help="Also write an int8 dynamically quantised model.")
+    args = parser.parse_args()
+
+    print(f"Exporting {args.model} to ONNX...")
+    export_model(args.model, args.output_dir, args.quantize)
+    print(f"Model written to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,19 +2,289 @@
 Streamlit front end for Curiosity AI.
 
 This simple UI allows a user to enter a seed topic, invoke the API and
-visualise the resulting questions and detected contradictions.  It uses the
-requests library to communicate with the FastAPI backend running on
-`localhost:8000` by default.
+visualise the resulting questions and detected contradictions.  It uses a
+urllib3 connection pool to communicate with the FastAPI backend running on
+`localhost:8000` by default.  Results are read from the streaming endpoint so
+that questions appear as soon as they are generated.
 """
-import json
+import hashlib
+from typing import Any, Callable, Iterator
 
+import msgpack
+import orjson
 import streamlit as st
-import requests
+import urllib3
 
-# Endpoint of the running API.  Adjust the port if you run the server on a
-# different port or host.  Using a relative path (e.g. "/ask") does not
-# work in Streamlit; you must specify the full URL including protocol.
-API_URL = "http://localhost:8000/ask"
+
+@st.cache_resource
+def _api_settings() -> dict:
+    """Return the `[api]` table of `.streamlit/secrets.toml`, or {} if there is none."""
+    try:
+        return dict(st.secrets.get("api", {}))
+    except FileNotFoundError:
+        return {}
+
+
+# Streamlit re-executes this module on every rerun, so the settings are
+# cached: secrets.toml is read once per process rather than on each rerun.
+_API = _api_settings()
+
+# Endpoint of the running API, set by `api.url` in `.streamlit/secrets.toml`.
+# Adjust it if you run the server on a different port or host.  Using a
+# relative path (e.g. "/ask") does not work in Streamlit; you must specify
+# the full URL including protocol.
+API_URL = _API.get("url", "http://localhost:8000/ask")
+STREAM_URL = API_URL + "/stream"
+
+# Connect and read timeouts in seconds.  The read timeout bounds the wait
+# between streamed events, so a hung backend frees the script runner quickly
+# instead of stalling it (and other sessions on the same worker) forever.
+TIMEOUT = urllib3.Timeout(
+    connect=_API.get("connect_timeout", 3.05), read=_API.get("read_timeout", 30)
+)
+
+# Ask for MessagePack, which is smaller than JSON and decodes novelty scores
+# straight from binary floats.  Newline-delimited JSON remains the fallback.
+MSGPACK = "application/msgpack"
+STREAM_HEADERS = {
+    "Accept": f"{MSGPACK}, application/x-ndjson;q=0.5",
+    "Content-Type": "application/json",
+}
+
+# Lists longer than this are shown as a table rather than as markdown.  A
+# dataframe is sent as one columnar payload and rendered in a virtualised
+# grid, which scales far better than large markdown blocks.  A trail holds
+# at most max_rounds * 6 questions (18 by default) and the dissonance log at
+# most 28 pairs, so the threshold must stay well below those bounds.
+TABLE_MIN_ROWS = 10
+
+# Topics are cut to this many characters before being sent.  A seed topic
+# is a short phrase; a pasted document would only cost a slow LLM round trip.
+MAX_TOPIC_CHARS = 512
+# Number of results each browser session keeps for topics it already asked
+# about, in addition to the cross-session cache in `cached_result`.  The
+# least recently used topic is evicted first.
+SESSION_CACHE_SIZE = 32
+
+# Markdown templates for one trail entry and one dissonance item.  Binding
+# `.format` once avoids an attribute lookup per entry when formatting lists.
+TRAIL_FMT = "**{i}.** {q} — novelty `{n:.2f}`".format
+DISSONANCE_FMT = "- ⚠️ {c:.2f}\n  • {a}\n  • {b}".format
+
+# Topic shown in the input box when the page first loads
+DEFAULT_TOPIC = "Teacher training vs curriculum reform outcomes in Nigeria"
+
+
+@st.cache_resource
+def get_pool() -> urllib3.PoolManager:
+    """
+    Return an HTTP connection pool shared by every rerun and user of this process.
+
+    Reusing one pool keeps connections to the API alive between clicks, so
+    only the first request pays for the TCP (and TLS) handshake.  Talking
+    to urllib3 directly skips the per-request session, cookie and hook
+    handling that requests layers on top of it.  Connection failures are
+    retried a few times with a short backoff.
+    """
+    return urllib3.PoolManager(
+        num_pools=4,
+        maxsize=20,
+        retries=urllib3.Retry(total=3, backoff_factor=0.2),
+    )
+
+
+# The shared pool, looked up once per script run as a module-level name
+# rather than through the cache on every request.
+POOL = get_pool()
+
+
+class APIError(Exception):
+    """Raised when the API rejects a request or reports an error mid-stream."""
+
+
+def iter_events(response: urllib3.BaseHTTPResponse) -> Iterator[dict]:
+    """Decode the events of a streaming response as they arrive."""
+    if response.headers.get("Content-Type", "").startswith(MSGPACK):
+        # MessagePack maps are self-delimiting, so the unpacker yields each
+        # event as soon as all of its bytes have been received.
+        unpacker = msgpack.Unpacker(raw=False)
+        for chunk in response.stream():
+            unpacker.feed(chunk)
+            yield from unpacker
+    else:
+        for line in response:
+            # NDJSON: one JSON object per line.  orjson parses the raw bytes
+            # directly, skipping a separate str decode.
+            if line.strip():
+                yield orjson.loads(line)
+
+
+def stream_result(
+    topic: str, on_question: Callable[[dict, int], None], refresh: bool = False
+) -> dict:
+    """
+    Explore `topic` through the streaming endpoint.
+
+    `on_question` is called each time a question arrives with the partial
+    result so far and the maximum number of questions the server expects,
+    so the caller can render progress incrementally.  Returns the full
+    result in the same shape as the `/ask` endpoint.  A partial result has
+    `elapsed_s` set to None.  With `refresh` the API generates new questions
+    rather than reusing its cached LLM completions.
+    """
+    data = {"topic": topic, "session": {"trail": [], "elapsed_s": None}, "dissonance": []}
+    expected = 0
+    response = POOL.request(
+        "POST",
+        STREAM_URL,
+        body=orjson.dumps({"topic": topic, "refresh": refresh}),
+        headers=STREAM_HEADERS,
+        timeout=TIMEOUT,
+        preload_content=False,
+    )
+    try:
+        if response.status != 200:
+            raise APIError(f"Error {response.status}: {response.data.decode('utf-8', 'replace')}")
+        for event in iter_events(response):
+            if event["type"] == "start":
+                expected = event["expected"]
+            elif event["type"] == "question":
+                data["session"]["trail"].append({"q": event["q"], "novelty": event["novelty"]})
+                on_question(data, expected)
+            elif event["type"] == "done":
+                data["session"]["elapsed_s"] = event["elapsed_s"]
+                data["dissonance"] = event["dissonance"]
+            elif event["type"] == "error":
+                raise APIError(event["detail"])
+    except BaseException:
+        # Never hand a partly read connection back to the pool.  This also
+        # runs when Streamlit stops the script for a rerun (e.g. the Skip
+        # button), so an abandoned stream is dropped rather than drained.
+        response.close()
+        raise
+    response.release_conn()
+    return data
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def cached_result(topic: str, _result: dict | None = None) -> dict:
+    """
+    Cache of API results keyed by topic, shared by all sessions for an hour.
+
+    Call with only `topic` to look a result up: a miss raises `KeyError`,
+    and exceptions are never cached.  Call again with `_result` to store it;
+    the leading underscore keeps it out of the cache key.  Results are
+    stored after streaming rather than by wrapping the request itself,
+    because cached functions cannot render into placeholders created
+    outside them.
+    """
+    if _result is None:
+        raise KeyError(topic)
+    return _result
+
+
+def topic_key(topic: str) -> bytes:
+    """Return a short digest identifying `topic` in the per-session result cache."""
+    return hashlib.blake2b(topic.encode("utf-8"), digest_size=16).digest()
+
+
+def trail_markdown(trail: list) -> str:
+    """
+    Format the curiosity trail as a single markdown block.
+
+    Rendering one block sends a single element to the browser instead of
+    one per entry.
+    """
+    return "\n\n".join(
+        TRAIL_FMT(i=idx, q=entry["q"], n=entry["novelty"])
+        for idx, entry in enumerate(trail, 1)
+    )
+
+
+def dissonance_markdown(items: list) -> str:
+    """Format the dissonance log as a single markdown list."""
+    return "\n".join(
+        DISSONANCE_FMT(c=item["contradiction"], a=item["a"], b=item["b"])
+        for item in items
+    )
+
+
+def render_trail(box: Any, trail: list) -> None:
+    """Render the curiosity trail into `box`, as a table when it is long."""
+    if len(trail) > TABLE_MIN_ROWS:
+        import pandas as pd  # only needed for long lists; see TABLE_MIN_ROWS
+
+        df = pd.DataFrame(trail).rename(columns={"q": "Question", "novelty": "Novelty"})
+        df.index += 1
+        box.dataframe(df, width="stretch")
+    else:
+        box.markdown(trail_markdown(trail))
+
+
+def render_dissonance(box: Any, items: list) -> None:
+    """Render the dissonance log into `box`, as a table when it is long."""
+    if len(items) > TABLE_MIN_ROWS:
+        import pandas as pd  # only needed for long lists; see TABLE_MIN_ROWS
+
+        df = pd.DataFrame(items, columns=["contradiction", "a", "b"]).rename(
+            columns={"contradiction": "Contradiction", "a": "Statement A", "b": "Statement B"}
+        )
+        box.dataframe(df, hide_index=True, width="stretch")
+    else:
+        box.markdown(dissonance_markdown(items))
+
+
+def trail_section(slot: Any) -> Any:
+    """Lay out the trail section in `slot` and return the placeholder for its entries."""
+    with slot.container():
+        st.subheader("Curiosity Trail")
+        return st.empty()
+
+
+def render_result(trail_slot: Any, diss_slot: Any, data: dict) -> None:
+    """Render a complete API result into the trail and dissonance slots."""
+    trail_box = trail_section(trail_slot)
+    if data["session"]["trail"]:
+        render_trail(trail_box, data["session"]["trail"])
+    else:
+        trail_box.write("No questions generated. Try a different topic.")
+    with diss_slot.container():
+        st.subheader("Dissonance Log")
+        if data["session"]["elapsed_s"] is None:
+            st.write("Generation stopped early, so contradictions were not checked.")
+        elif not data["dissonance"]:
+            st.write("No contradictions detected.")
+        else:
+            render_dissonance(st, data["dissonance"])
+
+
+def stream_with_progress(topic: str, trail_box: Any, refresh: bool = False) -> dict:
+    """
+    Stream a result into `trail_box` with a progress bar and a Skip button.
+
+    Clicking Skip reruns the script, which stops this run and closes the
+    stream when the next question arrives.  Every question is stored as
+    the session's last result as it arrives, so the rerun shows the
+    questions received so far.  `refresh` is passed on to `stream_result`.
+    """
+    progress = st.progress(0.0, text="Generating questions...")
+    skip_slot = st.empty()
+    skip_slot.button("Skip", key="skip_button", help="Stop generating and keep the questions so far")
+
+    def on_question(data: dict, expected: int) -> None:
+        st.session_state["last_result"] = (topic, data)
+        trail = data["session"]["trail"]
+        render_trail(trail_box, trail)
+        progress.progress(
+            min(len(trail) / max(expected, 1), 1.0),
+            text=f"Generated {len(trail)} questions...",
+        )
+
+    try:
+        return stream_result(topic, on_question, refresh)
+    finally:
+        progress.empty()
+        skip_slot.empty()
 
 
 def main() -> None:
@@ -25,38 +295,66 @@ def main() -> None:
         "highlighting contradictions. Enter a seed topic below to begin."
     )
 
-    topic = st.text_input("Seed topic", value="Teacher training vs curriculum reform outcomes in Nigeria", key="topic_input")
-    if st.button("Explore", key="explore_button"):
-        if not topic.strip():
+    topic = st.text_input("Seed topic", value=DEFAULT_TOPIC, key="topic_input")
+    explore = st.button("Explore", key="explore_button")
+    # Bypass the result caches and have the API generate new questions
+    regenerate = st.button("Re-generate", key="regenerate_button")
+    # Both result sections live in fixed slots created at the same place on
+    # every run, whichever path renders them.  The page therefore keeps the
+    # same element tree between reruns and Streamlit updates the sections
+    # in place instead of remounting them.
+    trail_slot, diss_slot = st.empty(), st.empty()
+    if explore or regenerate:
+        # Collapse whitespace so trivially different inputs share cache entries
+        topic = " ".join(topic.split())
+        if not topic:
             st.error("Please enter a non‑empty topic.")
         else:
-            with st.spinner("Generating questions..."):
-                try:
-                    response = requests.post(API_URL, json={"topic": topic.strip()})
-                    if response.status_code != 200:
-                        st.error(f"Error {response.status_code}: {response.text}")
-                        return
-                    data = response.json()
-                    # Display the curiosity trail
-                    st.subheader("Curiosity Trail")
-                    if not data["session"]["trail"]:
-                        st.write("No questions generated. Try a different topic.")
-                    for idx, entry in enumerate(data["session"]["trail"]):
-                        st.markdown(
-                            f"**{idx + 1}.** {entry['q']} — novelty `{entry['novelty']:.2f}`"
-                        )
-                    # Display dissonance log
-                    st.subheader("Dissonance Log")
-                    if not data["dissonance"]:
-                        st.write("No contradictions detected.")
-                    else:
-                        for item in data["dissonance"]:
-                            st.markdown(
-                                f"- ⚠️ {item['contradiction']:.2f}\n  • {item['a']}\n  • {item['b']}"
-                            )
-                except requests.RequestException as e:
+            if len(topic) > MAX_TOPIC_CHARS:
+                st.warning(f"The topic was shortened to its first {MAX_TOPIC_CHARS} characters.")
+                topic = topic[:MAX_TOPIC_CHARS]
+            key = topic_key(topic)
+            results = st.session_state.setdefault("results", {})
+            if regenerate:
+                # Drop only this topic's entry; the cache is shared by every session
+                cached_result.clear(topic)
+                results.pop(key, None)
+            # Display the curiosity trail, updating it as each question arrives
+            trail_box = trail_section(trail_slot)
+            try:
+                # A hit is re-inserted below, marking it as most recently used
+                data = results.pop(key, None)
+                if data is None:
+                    try:
+                        data = cached_result(topic)
+                    except KeyError:
+                        data = stream_with_progress(topic, trail_box, refresh=regenerate)
+                        # Only cache useful results so that failures are retried
+                        if data["session"]["trail"]:
+                            cached_result(topic, _result=data)
+            except APIError as e:
+                st.error(str(e))
+                return
+            except urllib3.exceptions.HTTPError as e:
+                # Failed connection attempts are wrapped in MaxRetryError
+                # once the retries are used up
+                if isinstance(getattr(e, "reason", e), urllib3.exceptions.TimeoutError):
+                    st.error("The API took too long to respond. Please try again in a moment.")
+                else:
                     st.error(f"Failed to call API: {e}")
-
+                return
+            if data["session"]["trail"]:
+                results[key] = data
+                # Dicts keep insertion order, so the first key is the least recently used
+                while len(results) > SESSION_CACHE_SIZE:
+                    results.pop(next(iter(results)))
+            # Remember the result so that later reruns can show it again
+            st.session_state["last_result"] = (topic, data)
+            render_result(trail_slot, diss_slot, data)
+    elif "last_result" in st.session_state:
+        # Any other widget interaction reruns the script.  Show the previous
+        # result from session state rather than dropping it from the page.
+        render_result(trail_slot, diss_slot, st.session_state["last_result"][1])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file